@@ -1,7 +1,10 @@
-import base64
 import subprocess
+import sys
 import time
-from PIL import Image
+from multiprocessing.shared_memory import SharedMemory
+
+
+IMG_HEADER = b"BEGIN RAW IMAGE"
 
 
 if __name__ == "__main__":
@@ -9,27 +12,123 @@ if __name__ == "__main__":
     height = 900
     max_iter = 1000
 
+    # How tangerine hands back the image: "shm" writes the pixels into a
+    # shared memory segment, "raw" writes them verbatim to stdout, and
+    # "base64" writes them to stdout base64 encoded.
+    transport = "shm"
+
     start = time.time()
 
     with open("models/step-pyramid.rkt", "rb") as infile:
         model_source = infile.read()
 
-    proc = subprocess.run(f"./tangerine.exe --racket --headless {width} {height} --iterations {max_iter}", capture_output=True, input=model_source)
-    img_header = b"BEGIN RAW IMAGE"
-    if proc.stdout.count(img_header) == 0:
-        print(proc.stdout.decode("utf-8"))
-    assert(proc.stdout.count(img_header) == 1)
+    shm = None
+    transport_flags = ""
+    if transport == "shm":
+        shm = SharedMemory(create=True, size=width * height * 3)
+        transport_flags = f" --shm {shm.name}"
+    elif transport == "raw":
+        transport_flags = " --raw-image"
+
+    try:
+        proc = subprocess.Popen(f"./tangerine.exe --racket --headless {width} {height} --iterations {max_iter}{transport_flags}", stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        proc.stdin.write(model_source)
+        proc.stdin.close()
+
+        # Modules that aren't needed until the image arrives are imported while
+        # tangerine starts up and renders, rather than delaying its launch.
+        try:
+            import pybase64 as base64
+        except ImportError:
+            import base64
+        from PIL import Image
+
+        # Read the informational text up to the image header.  Each search only
+        # covers the new chunk plus enough of the previous tail to catch a header
+        # split across reads.
+        stdout = bytearray()
+        search_start = 0
+        while (info_end := stdout.find(IMG_HEADER, search_start)) == -1:
+            chunk = proc.stdout.read1(1 << 16)
+            if not chunk:
+                break
+            search_start = max(0, len(stdout) - len(IMG_HEADER) + 1)
+            stdout += chunk
+        if info_end == -1:
+            proc.wait()
+            sys.stdout.buffer.write(stdout)
+            sys.stdout.buffer.write(b"\n")
+            sys.stdout.flush()
+        assert(info_end != -1)
+
+        # Forward tangerine's own output as is, without decoding it.
+        with memoryview(stdout) as view:
+            sys.stdout.buffer.write(view[:info_end])
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.flush()
+
+        pending = stdout[info_end + len(IMG_HEADER):]
+        del stdout
+        if shm:
+            # The pixels were already in place by the time the header was printed,
+            # so the header is all there is to check for.
+            image_bytes = shm.buf[:width * height * 3]
+            consumed = 0
+        elif transport == "raw":
+            image_bytes = bytearray(width * height * 3)
+            # The pixels follow the header as is, so read them straight into place.
+            with memoryview(image_bytes) as view:
+                offset = consumed = min(len(pending), len(view))
+                view[:offset] = pending[:offset]
+                while offset < len(view) and (count := proc.stdout.readinto(view[offset:])):
+                    offset += count
+            assert(offset == len(image_bytes))
+        else:
+            image_bytes = bytearray(width * height * 3)
 
-    info_end = proc.stdout.index(img_header)
-    img_start = info_end + len(img_header)
+            # The encoded size is known up front, so read the payload into a
+            # preallocated buffer and decode each new run of whole four character
+            # groups straight into the image as it arrives.  A second header would
+            # fail base64 validation, so it needn't be searched for.
+            encoded = bytearray(4 * ((len(image_bytes) + 2) // 3))
+            with memoryview(encoded) as src, memoryview(image_bytes) as dst:
+                received = consumed = min(len(pending), len(src))
+                src[:received] = pending[:received]
+                decoded_end = 0
+                offset = 0
+                while True:
+                    usable = received - received % 4
+                    if usable > decoded_end:
+                        decoded = base64.b64decode(src[decoded_end:usable], validate=True)
+                        dst[offset:offset + len(decoded)] = decoded
+                        offset += len(decoded)
+                        decoded_end = usable
+                    if received == len(src):
+                        break
+                    count = proc.stdout.readinto1(src[received:received + (1 << 20)])
+                    if not count:
+                        break
+                    received += count
+            assert(offset == len(image_bytes))
 
-    print(proc.stdout[:info_end].decode("utf-8"))
-    image_bytes = base64.b64decode(proc.stdout[img_start:], validate=True)
+        # Whatever tangerine prints after the image must not hold another header.
+        trailing = pending[consumed:] + proc.stdout.read()
+        assert(IMG_HEADER not in trailing)
+        proc.wait()
 
-    raw_mode = "RGB"
-    stride = 0
-    orientation = -1
-    fnord = Image.frombytes("RGB", (width, height), image_bytes, "raw", raw_mode, stride, orientation)
+        # glReadPixels returns the rows bottom-up, which the raw decoder flips.
+        # Pillow can only alias buffers for the modes in Image._MAPMODES, and RGB
+        # isn't one of them, so frombuffer would just forward to frombytes.
+        raw_mode = "RGB"
+        stride = 0
+        orientation = -1
+        fnord = Image.frombytes("RGB", (width, height), image_bytes, "raw", raw_mode, stride, orientation)
+    finally:
+        if shm:
+            # The segment can't be closed while anything still views it.
+            image_bytes = None
+            shm.close()
+            shm.unlink()
     fnord.save("test_render.png")
 
     delta = time.time() - start
@@ -47,8 +47,14 @@
 
 #if _WIN64
 #include <shobjidl.h>
+#include <io.h>
+#include <fcntl.h>
 #else
 #include <gtk/gtk.h>
+#include <unistd.h>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
 #endif
 
 #include <fmt/format.h>
@@ -411,6 +417,51 @@ void EncodeBase64(std::vector<unsigned char>& Bytes, std::vector<char>& Encoded)
 }
 
 
+// Copy the pixel data into a named shared memory segment created by the calling process.
+bool WriteSharedMemory(const std::string& Name, std::vector<unsigned char>& PixelData)
+{
+#if _WIN64
+	HANDLE Mapping = OpenFileMappingA(FILE_MAP_WRITE, FALSE, Name.c_str());
+	if (Mapping == nullptr)
+	{
+		return false;
+	}
+	void* View = MapViewOfFile(Mapping, FILE_MAP_WRITE, 0, 0, PixelData.size());
+	CloseHandle(Mapping);
+	if (View == nullptr)
+	{
+		return false;
+	}
+	memcpy(View, PixelData.data(), PixelData.size());
+	UnmapViewOfFile(View);
+	return true;
+#else
+	// Python's SharedMemory prepends a slash to the names it hands out.
+	const std::string Path = "/" + Name;
+	const int Handle = shm_open(Path.c_str(), O_RDWR, 0);
+	if (Handle == -1)
+	{
+		return false;
+	}
+	struct stat Info;
+	if (fstat(Handle, &Info) == -1 || size_t(Info.st_size) < PixelData.size())
+	{
+		close(Handle);
+		return false;
+	}
+	void* View = mmap(nullptr, PixelData.size(), PROT_WRITE, MAP_SHARED, Handle, 0);
+	close(Handle);
+	if (View == MAP_FAILED)
+	{
+		return false;
+	}
+	memcpy(View, PixelData.data(), PixelData.size());
+	munmap(View, PixelData.size());
+	return true;
+#endif
+}
+
+
 struct ViewInfoUpload
 {
 	glm::mat4 WorldToView;
@@ -1593,6 +1644,8 @@ void Boot(int argc, char* argv[])
 	int WindowWidth = 900;
 	int WindowHeight = 900;
 	HeadlessMode = false;
+	bool RawImageOutput = false;
+	std::string SharedMemoryName;
 	bool LoadFromStandardIn = false;
 	Language PipeRuntime = Language::Unknown;
 	{
@@ -1625,6 +1678,18 @@ void Boot(int argc, char* argv[])
 				continue;
 			}
 #endif
+			else if (Args[Cursor] == "--raw-image")
+			{
+				RawImageOutput = true;
+				Cursor += 1;
+				continue;
+			}
+			else if (Args[Cursor] == "--shm" && (Cursor + 1) < Args.size())
+			{
+				SharedMemoryName = Args[Cursor + 1];
+				Cursor += 2;
+				continue;
+			}
 			else if (Args[Cursor] == "--iterations" && (Cursor + 1) < Args.size())
 			{
 				const int MaxIterations = atoi(Args[Cursor + 1].c_str());
@@ -1785,19 +1850,52 @@ void Boot(int argc, char* argv[])
 			glFinish();
 		}
 
-		// Base64 encode the rendered image and dump it to stdout.
+		// Dump the rendered image to shared memory if a segment name was given, otherwise to stdout.
+		// Only the header is printed in the former case.  On stdout, the image is base64 encoded
+		// unless raw output was requested and stdout is not a terminal.
 		{
 			std::vector<unsigned char> PixelData;
 			DumpFrameBuffer(WindowWidth, WindowHeight, PixelData);
 
-			std::vector<char> Encoded;
-			EncodeBase64(PixelData, Encoded);
-
-			std::cout << "BEGIN RAW IMAGE";
-			size_t i = 0;
-			for (char& Byte : Encoded)
+#if _WIN64
+			const bool WriteRaw = RawImageOutput && !_isatty(_fileno(stdout));
+#else
+			const bool WriteRaw = RawImageOutput && !isatty(fileno(stdout));
+#endif
+			if (!SharedMemoryName.empty())
+			{
+				if (WriteSharedMemory(SharedMemoryName, PixelData))
+				{
+					std::cout << "BEGIN RAW IMAGE";
+					std::cout.flush();
+				}
+				else
+				{
+					std::cout << "Failed to write the image to shared memory.\n";
+				}
+			}
+			else if (WriteRaw)
 			{
-				std::cout << Byte;
+				std::cout << "BEGIN RAW IMAGE";
+				std::cout.flush();
+#if _WIN64
+				// Keep the C runtime from translating newline bytes in the pixel data.
+				_setmode(_fileno(stdout), _O_BINARY);
+#endif
+				std::cout.write(reinterpret_cast<const char*>(PixelData.data()), PixelData.size());
+				std::cout.flush();
+			}
+			else
+			{
+				std::vector<char> Encoded;
+				EncodeBase64(PixelData, Encoded);
+
+				std::cout << "BEGIN RAW IMAGE";
+				size_t i = 0;
+				for (char& Byte : Encoded)
+				{
+					std::cout << Byte;
+				}
 			}
 		}
 	}
@@ -1,71 +1,94 @@
 
-import subprocess
+import os.path, subprocess, sys, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+OPENGL_EXTENSIONS = ",".join(sorted((
+    "GL_ARB_buffer_storage",
+    "GL_ARB_clear_texture",
+    "GL_ARB_clip_control",
+    "GL_ARB_compute_shader",
+    "GL_ARB_debug_output",
+    "GL_ARB_direct_state_access",
+    "GL_ARB_gpu_shader5",
+    "GL_ARB_program_interface_query",
+    "GL_ARB_shader_image_load_store",
+    "GL_ARB_shader_storage_buffer_object",
+    "GL_KHR_debug",
+)))
+
 
 def opengl_params(debug):
-    extensions = \
-    sorted([
-        "GL_ARB_buffer_storage",
-        "GL_ARB_clear_texture",
-        "GL_ARB_clip_control",
-        "GL_ARB_compute_shader",
-        "GL_ARB_debug_output",
-        "GL_ARB_direct_state_access",
-        "GL_ARB_gpu_shader5",
-        "GL_ARB_program_interface_query",
-        "GL_ARB_shader_image_load_store",
-        "GL_ARB_shader_storage_buffer_object",
-        "GL_KHR_debug",
-    ])
     return {
         "out-path" : "glad",
         "profile" : "core",
         "api" : "gl=4.2",
         "generator" : "c-debug" if debug else "c",
         "spec" : "gl",
-        "extensions" : f"{','.join(extensions)}",
+        "extensions" : OPENGL_EXTENSIONS,
     }
 
 
+WGL_EXTENSIONS = ",".join(sorted((
+    "WGL_EXT_extensions_string",
+    "WGL_ARB_extensions_string",
+    "WGL_ARB_create_context",
+    "WGL_ARB_create_context_profile",
+    "WGL_ARB_pixel_format",
+    "WGL_ARB_pbuffer",
+)))
+
+
 def wgl_params(debug):
-    extensions = \
-    sorted([
-        "WGL_EXT_extensions_string",
-        "WGL_ARB_extensions_string",
-        "WGL_ARB_create_context",
-        "WGL_ARB_create_context_profile",
-        "WGL_ARB_pixel_format",
-        "WGL_ARB_pbuffer",
-    ])
     return {
         "out-path" : "glad",
         "api" : "wgl=1.0",
         "generator" : "c-debug" if debug else "c",
         "spec" : "wgl",
-        "extensions" : f"{','.join(extensions)}",
+        "extensions" : WGL_EXTENSIONS,
     }
 
 
+GLX_EXTENSIONS = ",".join(sorted((
+    "GLX_ARB_create_context",
+    "GLX_ARB_create_context_profile",
+)))
+
+
 def glx_params(debug):
-    extensions = \
-    sorted([
-        "GLX_ARB_create_context",
-        "GLX_ARB_create_context_profile",
-    ])
     return {
         "out-path" : "glad",
         "api" : "glx=1.4",
         "generator" : "c-debug" if debug else "c",
         "spec" : "glx",
-        "extensions" : f"{','.join(extensions)}",
+        "extensions" : GLX_EXTENSIONS,
     }
 
 
+def fetch_spec(spec):
+    # glad uses "<spec>.xml" from the working directory when it is present,
+    # so the spec only needs to be downloaded from Khronos the first time.
+    # The download is only moved into place once it completes, so that an
+    # interrupted one isn't mistaken for a cached spec later.
+    path = f"{spec}.xml"
+    if not os.path.exists(path):
+        partial = f"{path}.part"
+        urllib.request.urlretrieve(f"https://registry.khronos.org/OpenGL/xml/{path}", partial)
+        os.replace(partial, path)
+
+
 def download_glad(params):
-    glad = ["python", "-m glad", "--local-files"] + [f" --{n}={v}" for (n,v) in params.items()]
-    subprocess.call(" ".join(glad), shell=True)
+    fetch_spec(params["spec"])
+    glad = [sys.executable, "-m", "glad", "--local-files"] + [f"--{n}={v}" for (n,v) in params.items()]
+    subprocess.run(glad, check=True)
 
 
 if __name__ == "__main__":
-    download_glad(wgl_params(False))
-    download_glad(glx_params(False))
+    # Every glad run creates the output directory and downloads khrplatform.h
+    # into it if either is missing, so concurrent runs on a clean checkout race
+    # on the same paths.  The gl loader is generated first to create them,
+    # after which the wgl and glx loaders only write their own files and can
+    # run side by side.  Consuming the results re-raises any failed run.
     download_glad(opengl_params(False))
+    params = [wgl_params(False), glx_params(False)]
+    with ThreadPoolExecutor(max_workers=len(params)) as pool:
+        list(pool.map(download_glad, params))
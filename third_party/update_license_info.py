@@ -13,20 +13,36 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os.path, glob
+import os, mmap
 
 
-template = """
-#if {}
-if (ImGui::BeginTabItem("{}"))
+def template(condition, project, license):
+    # An f-string builds the block without parsing a format string each call.
+    return f"""
+#if {condition}
+if (ImGui::BeginTabItem("{project}"))
 {{
-	ImGui::TextUnformatted("{}", nullptr);
+	ImGui::TextUnformatted("{license}", nullptr);
 	ImGui::EndTabItem();
 }}
 #endif
 """
 
 
+# Escapes newlines and quotes in a single pass.  Carriage returns are
+# stripped from the raw bytes before decoding.
+escapes = str.maketrans({"\n" : "\\n", "\"" : "\\\""})
+
+
+def read_license(path):
+    # Empty files can't be mapped, and have nothing to read anyway.
+    with open(path, "rb") as INFILE:
+        if os.fstat(INFILE.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(INFILE.fileno(), 0, access=mmap.ACCESS_READ) as MAPPED:
+            return bytes(MAPPED).translate(None, b"\r").decode("utf-8")
+
+
 def splat_license(project, path):
     if project.lower().startswith("racket"):
         condition = "EMBED_RACKET"
@@ -34,35 +50,33 @@ def splat_license(project, path):
         condition = "EMBED_LUA"
     else:
         condition = "1"
-    with open(path, "r") as INFILE:
-        license = INFILE.read()
-        license = license.replace("\r", "")
-        license = license.replace("\n", "\\n")
-        license = license.replace("\"", "\\\"")
-        return template.format(condition, project, license)
+    license = read_license(path)
+    return template(condition, project, license.translate(escapes)).encode("utf-8")
 
 
 if __name__ == "__main__":
-    paths = []
-    variants = ["LICENSE", "copying"]
-    for variant in variants:
-        paths += glob.glob(f"*/{variant}*")
-
+    # Find the license files in each project directory in one sweep.  Names
+    # are compared with normcase to match glob's behavior on each platform.
+    variants = tuple(os.path.normcase(variant) for variant in ["LICENSE", "copying"])
     projects = []
-    for path in paths:
-        name = os.path.split(path)[0]
-        projects.append((name, path))
+    with os.scandir(".") as subdirs:
+        for subdir in subdirs:
+            if subdir.name.startswith(".") or not subdir.is_dir():
+                continue
+            with os.scandir(subdir.name) as entries:
+                for entry in entries:
+                    if os.path.normcase(entry.name).startswith(variants):
+                        projects.append((subdir.name, os.path.join(subdir.name, entry.name)))
     projects.sort()
 
-    inl = """
+    header = b"""
 // This file was generated by a script, and contains code for displaying
 // open source license information via DearIMGUI.  This contains both
 // the license text for Tangerine, and Tangerine's third party dependencies.
 """
 
-    inl += splat_license("Tangerine", "../LICENSE.txt")
-    for name, path in projects:
-        inl += splat_license(name, path)
-
-    with open("licenses.inl", "w") as OUTFILE:
-        OUTFILE.write(inl)
+    with open("licenses.inl", "wb", buffering=1 << 20) as OUTFILE:
+        OUTFILE.write(header)
+        OUTFILE.write(splat_license("Tangerine", "../LICENSE.txt"))
+        for name, path in projects:
+            OUTFILE.write(splat_license(name, path))